@@ -5,88 +5,281 @@ Reads `Input/Application_Inventory.xlsx` and uses the columns that best
 match `From_App`, `To-App`, and `Interface_Name` to build a Graphviz
 diagram. Outputs a DOT file plus attempts to render `svg` and `png` into
 `Output/Diagrams`.
+
+Only the standard library and one workbook reader (python-calamine, or
+openpyxl as a pure-Python fallback) are required; pyarrow and cairosvg are
+optional speed-ups. The openpyxl path runs unchanged under PyPy, whose JIT
+suits this string-heavy row loop.
 """
 import os
 import sys
+import asyncio
+import glob
+import subprocess
 from collections import defaultdict
+from datetime import date, datetime, time as dt_time
+from operator import itemgetter
 import argparse
 
+# python-calamine (Rust parser) is preferred; openpyxl is the fallback reader
 try:
-    import pandas as pd
-except Exception:
-    print("pandas is required. Install with: pip install -r requirements.txt")
-    raise
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+    try:
+        import openpyxl
+    except Exception:
+        print("python-calamine or openpyxl is required. Install with: pip install -r requirements.txt")
+        raise
+
 
+# cairosvg is optional: when present, the PNG is rasterized from the SVG
+# instead of running a second Graphviz layout
 try:
-    import graphviz
+    import cairosvg
 except Exception:
-    print("graphviz (python package) is required. Install with: pip install -r requirements.txt")
-    raise
+    cairosvg = None
+
+# pyarrow is optional: when present, parsed edges are cached in a parquet
+# sidecar next to the workbook so unchanged inventories skip XLSX parsing
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
 
 EXCEL_PATH = os.path.join("Input", "Application_Inventory.xlsx")
 OUT_DIR = os.path.join("Output", "Diagrams")
 
+EDGE_FIELDS = ("src", "dst", "iface", "inttype", "dir_val")
+# part of the parquet sidecar name: bump whenever the edges derived from a
+# workbook change (load_edges, find_column, the readers, or EDGE_FIELDS) so
+# sidecars written by older code are not reused
+CACHE_VERSION = 2
+
+# label/font size and placement shared by every interface edge: center the
+# interface name on the arrow (angle 0 and reasonable distance)
+DEFAULT_EDGE_ATTRS = {"fontsize": "10", "labelangle": "0", "labeldistance": "1.0"}
+_DEFAULT_EDGE_FRAG = "".join(f" {k}={v}" for k, v in DEFAULT_EDGE_ATTRS.items())
+# preformatted edge lines, filled with (src, dst, label, dir[, color, fontcolor])
+_EDGE_TPL = '\t"%s" -> "%s" [label="%s" dir=%s' + _DEFAULT_EDGE_FRAG + ']\n'
+_COLORED_EDGE_TPL = '\t"%s" -> "%s" [label="%s" dir=%s color="%s" fontcolor="%s"' + _DEFAULT_EDGE_FRAG + ']\n'
+
+# graph-level attributes written at the top of the DOT source
+GRAPH_ATTRS = {"rankdir": "LR", "splines": "true", "nodesep": "0.4", "ranksep": "0.6"}
+
+
+def interface_style(inttype):
+    # edge (and label) color for an interface type, or None for the default
+    t = inttype.lower()
+    if "file" in t:
+        return "red"
+    elif "webservice" in t or "web service" in t:
+        return "blue"
+    return None
+
+
+def _q(text):
+    # escape a value for use inside a double-quoted DOT string
+    return text.replace("\\", "\\\\").replace('"', '\\"')
 
-def find_column(df, candidates):
-    cols = {c.lower().strip(): c for c in df.columns}
-    for cand in candidates:
-        for k, orig in cols.items():
-            if cand in k:
-                return orig
+
+def _strongly_connected(nodes, succ):
+    # iterative Tarjan: maps each node to its component's root node, in
+    # O(V+E) and without recursion (deep chains would hit the recursion limit)
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    comp = {}
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(succ[root]))]
+        while work:
+            v, children = work[-1]
+            for w in children:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(succ[w])))
+                    break
+                elif w in on_stack:
+                    low[v] = min(low[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        comp[w] = v
+                        if w == v:
+                            break
+    return comp
+
+
+def layer_positions(nodes, edges, x_step=180, y_step=72):
+    # precomputed left-to-right layout for the `nop` engine. Cycles (request/
+    # response pairs) are collapsed into strongly connected components, the
+    # resulting acyclic graph is split into topological generations, and each
+    # generation becomes one column; all members of a component share it.
+    succ = {n: set() for n in nodes}
+    for src, dst, *_ in edges:
+        if src != dst:
+            succ[src].add(dst)
+    comp = _strongly_connected(nodes, succ)
+
+    comp_succ = defaultdict(set)
+    indeg = dict.fromkeys(comp.values(), 0)
+    for n, targets in succ.items():
+        c = comp[n]
+        for m in targets:
+            d = comp[m]
+            if d != c and d not in comp_succ[c]:
+                comp_succ[c].add(d)
+                indeg[d] += 1
+
+    members = defaultdict(list)
+    for n in nodes:
+        members[comp[n]].append(n)
+
+    pos = {}
+    ready = [c for c, k in indeg.items() if k == 0]
+    layer = 0
+    while ready:
+        column = sorted(n for c in ready for n in members[c])
+        for row, n in enumerate(column):
+            pos[n] = (layer * x_step, -row * y_step)
+        nxt = []
+        for c in ready:
+            for d in comp_succ[c]:
+                indeg[d] -= 1
+                if indeg[d] == 0:
+                    nxt.append(d)
+        ready = nxt
+        layer += 1
+    return pos
+
+
+def header_key(name):
+    # normalized form used to compare header names: 'To-App', 'to app' and
+    # 'TO_APP' all become 'to_app'
+    return name.lower().strip().replace(" ", "_").replace("-", "_")
+
+
+def find_column(cols, candidates):
+    # cols maps header_key() names to column indices; an exact match is a dict
+    # lookup, and the substring scan is only a fallback for headers with extra
+    # words (e.g. 'From App Name'). Longer candidates are tried first so a
+    # short one like 'to' cannot claim an unrelated column ('auto_update')
+    # while a more specific header is present.
+    keys = sorted((header_key(c) for c in candidates), key=len, reverse=True)
+    for key in keys:
+        if key in cols:
+            return cols[key]
+    for key in keys:
+        for k, idx in cols.items():
+            if key in k:
+                return idx
     return None
 
 
 def normalize(value):
-    if pd.isna(value):
+    # strings (the common case) skip the None/NaN checks entirely
+    if isinstance(value, str):
+        return value.strip()
+    if value is None or value != value:
         return None
     return str(value).strip()
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Generate architecture diagram from Excel")
-    parser.add_argument("--focus", help="Only show edges where this node is source or destination (case-insensitive)")
-    args = parser.parse_args()
-    focus = args.focus.strip() if args.focus else None
-    if not os.path.exists(EXCEL_PATH):
-        print(f"Excel file not found at {EXCEL_PATH}")
-        sys.exit(2)
+def _calamine_cell(value):
+    # calamine returns whole numbers as floats and midnight datetimes as
+    # dates; convert them to what openpyxl returns (101, not '101.0') so node
+    # names do not depend on which reader is installed
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if type(value) is date:
+        return datetime.combine(value, dt_time())
+    return value
 
-    df = pd.read_excel(EXCEL_PATH, engine="openpyxl")
 
-    # heuristics for column names
-    from_col = find_column(df, ["from_app", "from-app", "from", "from app"])
-    to_col = find_column(df, ["to_app", "to-app", "to", "to app", "to_app"])
-    iface_col = find_column(df, ["interface_name", "interface-name", "interface", "interface name"])
-    # optional columns for styling/direction
-    inttype_col = find_column(df, ["int_type", "int-type", "interface_type", "interface-type", "int type", "interface type", "int_type"])
-    dir_col = find_column(df, ["direction", "dir", "Direction", "Direction"])
+def _iter_rows_calamine(path):
+    with CalamineWorkbook.from_path(path) as wb:
+        for row in wb.get_sheet_by_index(0).iter_rows():
+            yield [v if type(v) is str else _calamine_cell(v) for v in row]
 
-    if not from_col or not to_col or not iface_col:
-        print("Could not locate required columns. Found:")
-        print("  from_col:", from_col)
-        print("  to_col:", to_col)
-        print("  iface_col:", iface_col)
-        print("Columns present in the sheet:")
-        for c in df.columns:
-            print(" -", c)
-        sys.exit(3)
 
-    # collect unique interfaces and optional styling
-    edges = []
-    for _, row in df.iterrows():
-        src = normalize(row[from_col])
-        dst = normalize(row[to_col])
-        iface = normalize(row[iface_col])
+def _iter_rows_openpyxl(path):
+    # read-only mode parses rows lazily instead of building the whole
+    # workbook in memory
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        # read-only sheets trust the stored <dimension> tag, which some writers
+        # leave stale (e.g. A1:A1) and which would truncate every row; pandas
+        # resets it for the same reason
+        ws.reset_dimensions()
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def open_inventory(path):
+    # stream the first sheet; closing the returned row generator releases
+    # the workbook
+    if CalamineWorkbook is not None:
+        rows = _iter_rows_calamine(path)
+    else:
+        rows = _iter_rows_openpyxl(path)
+    header = ["" if h is None else str(h) for h in next(rows, ())]
+    return header, rows
+
+
+def load_edges(rows, from_idx, to_idx, iface_idx, inttype_idx, dir_idx):
+    # identical rows (e.g. the same interface listed per environment) collapse
+    # into one edge; a dict keeps them unique in first-seen order
+    edges = {}
+    total = 0
+    # resolve column positions once; missing optional columns read the
+    # from-column as a placeholder and are discarded below
+    has_inttype = inttype_idx is not None
+    has_dir = dir_idx is not None
+    positions = (
+        from_idx,
+        to_idx,
+        iface_idx,
+        inttype_idx if has_inttype else from_idx,
+        dir_idx if has_dir else from_idx,
+    )
+    pick = itemgetter(*positions)
+    width = max(positions) + 1
+    for row in rows:
+        if len(row) < width:
+            # short rows: treat the missing trailing cells as empty
+            row = tuple(row) + (None,) * (width - len(row))
+        src, dst, iface, inttype, raw_direction = pick(row)
+        src = normalize(src)
+        dst = normalize(dst)
+        iface = normalize(iface)
         if not src or not dst or not iface:
             continue
 
-        inttype = normalize(row[inttype_col]) if inttype_col else None
-        raw_direction = row[dir_col] if dir_col else None
+        inttype = normalize(inttype) if has_inttype else None
+        if not has_dir:
+            raw_direction = None
 
         # normalize direction to integer when possible (handle numeric types and '2.0')
         dir_val = None
-        if raw_direction is not None and not pd.isna(raw_direction):
+        if normalize(raw_direction) is not None:
             try:
                 # handle numeric types and strings like '2.0'
                 dir_val = int(float(raw_direction))
@@ -99,28 +292,116 @@ def main():
                         dir_val = int(digits)
                     except Exception:
                         dir_val = None
-        edges.append((src, dst, iface, inttype, dir_val))
+        edges[(src, dst, iface, inttype, dir_val)] = None
+        total += 1
+    if total > len(edges):
+        print(f"Collapsed {total - len(edges)} duplicate rows ({len(edges)} unique edges from {total} rows)")
+    return list(edges)
+
+
+def read_inventory_edges(path):
+    header, rows = open_inventory(path)
+
+    # heuristics for column names (indices into the header row)
+    # the leftmost column wins when headers repeat (or normalize to the same
+    # key), as with the original ordered scan
+    cols = {}
+    for i, h in enumerate(header):
+        cols.setdefault(header_key(h), i)
+    from_col = find_column(cols, ["from_app", "from"])
+    to_col = find_column(cols, ["to_app", "to"])
+    iface_col = find_column(cols, ["interface_name", "interface"])
+    # optional columns for styling/direction
+    inttype_col = find_column(cols, ["int_type", "interface_type"])
+    dir_col = find_column(cols, ["direction", "dir"])
 
-    # If a focus node was requested, filter edges to only those connected to focus
-    if focus:
-        focus_low = focus.lower()
-        filtered = []
-        for src, dst, iface, inttype, dir_val in edges:
-            if src.lower() == focus_low or dst.lower() == focus_low:
-                filtered.append((src, dst, iface, inttype, dir_val))
-        edges = filtered
-
-    if not edges:
-        print("No valid edges found in the spreadsheet.")
-        sys.exit(0)
+    if from_col is None or to_col is None or iface_col is None:
+        rows.close()
+        print("Could not locate required columns. Found:")
+        print("  from_col:", header[from_col] if from_col is not None else None)
+        print("  to_col:", header[to_col] if to_col is not None else None)
+        print("  iface_col:", header[iface_col] if iface_col is not None else None)
+        print("Columns present in the sheet:")
+        for c in header:
+            print(" -", c)
+        sys.exit(3)
+
+    # collect unique interfaces and optional styling
+    try:
+        return load_edges(rows, from_col, to_col, iface_col, inttype_col, dir_col)
+    finally:
+        rows.close()
+
+
+def index_by_node(edges):
+    # lower-cased node name -> positions (in order) of the edges touching it,
+    # so focus filtering is a dict lookup instead of a scan of every edge
+    by_node = defaultdict(list)
+    for i, (src, dst, *_) in enumerate(edges):
+        src_low = src.lower()
+        dst_low = dst.lower()
+        by_node[src_low].append(i)
+        if dst_low != src_low:
+            by_node[dst_low].append(i)
+    return by_node
+
+
+def cache_path(path):
+    # the sidecar name encodes the cache version and the workbook's mtime and
+    # size, so a parser change or any edit to the workbook misses the cache
+    st = os.stat(path)
+    folder, name = os.path.split(path)
+    stem = os.path.splitext(name)[0]
+    return os.path.join(folder, f".{stem}.v{CACHE_VERSION}.{st.st_mtime_ns}_{st.st_size}.parquet")
+
+
+def read_cached_edges(path):
+    if pq is None:
+        return None
+    sidecar = cache_path(path)
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        columns = pq.read_table(sidecar).to_pydict()
+        return list(zip(*(columns[f] for f in EDGE_FIELDS)))
+    except Exception as e:
+        print("Ignoring unreadable cache", sidecar, ":", e)
+        return None
+
+
+def write_cached_edges(path, edges):
+    if pa is None:
+        return
+    sidecar = cache_path(path)
+    schema = pa.schema([
+        ("src", pa.string()),
+        ("dst", pa.string()),
+        ("iface", pa.string()),
+        ("inttype", pa.string()),
+        ("dir_val", pa.int64()),
+    ])
+    columns = list(zip(*edges)) or [()] * len(EDGE_FIELDS)
+    try:
+        # building the table can fail too (e.g. a direction value beyond int64)
+        table = pa.Table.from_pydict(
+            {f: list(col) for f, col in zip(EDGE_FIELDS, columns)}, schema=schema
+        )
+        # drop sidecars left behind by earlier versions of the workbook or
+        # of this script
+        folder, name = os.path.split(path)
+        stem = os.path.splitext(name)[0]
+        for old in glob.glob(os.path.join(folder, f".{glob.escape(stem)}.*.parquet")):
+            os.remove(old)
+        pq.write_table(table, sidecar, compression="zstd")
+    except Exception as e:
+        # caching is best-effort; the diagram does not depend on it
+        print("Could not write cache", sidecar, ":", e)
 
-    os.makedirs(OUT_DIR, exist_ok=True)
 
-    dot = graphviz.Digraph(name="Architecture", format="svg")
-    dot.attr(rankdir="LR")
-    dot.attr(splines="true")
-    dot.attr(nodesep="0.4")
-    dot.attr(ranksep="0.6")
+def build_dot_source(edges, engine):
+    # The DOT source is emitted as text fragments and rendered with `dot`
+    out = ["digraph Architecture {\n"]
+    out.extend(f"\t{k}={v}\n" for k, v in GRAPH_ATTRS.items())
 
     # add nodes set
     nodes = set()
@@ -128,8 +409,17 @@ def main():
         nodes.add(src)
         nodes.add(dst)
 
-    for n in sorted(nodes):
-        dot.node(n, shape="box")
+    # sort once: the same order drives node emission and the legend anchor
+    nodes_sorted = sorted(nodes)
+    # escape each node name once; edges reuse the quoted form
+    quoted = {n: _q(n) for n in nodes_sorted}
+    positions = layer_positions(nodes_sorted, edges) if engine == "nop" else None
+    for n in nodes_sorted:
+        if positions:
+            x, y = positions[n]
+            out.append(f'\t"{quoted[n]}" [shape=box pos="{x},{y}!"]\n')
+        else:
+            out.append(f'\t"{quoted[n]}" [shape=box]\n')
 
     # Add legend: HTML table node, try to anchor at bottom-left using a sink rank
     # smaller-font legend placed in a sink-ranked subgraph to bias bottom placement
@@ -142,80 +432,205 @@ def main():
         '</TABLE>>'
     )
     # create a subgraph for the legend with rank=sink to push it toward the bottom
-    try:
-        sg = graphviz.Digraph(name="cluster_legend")
-        sg.attr(rank="sink")
-        sg.node("legend", label=legend_label, shape="none")
-        dot.subgraph(sg)
-        # anchor legend to the leftmost node with an invisible, weighted edge so it sits left-bottom
-        leftmost = sorted(nodes)[0] if nodes else None
-        if leftmost:
-            dot.edge("legend", leftmost, style="invis", weight="100", constraint="true")
-    except Exception:
-        # if any Graphviz API call fails, fall back to a simple legend node
-        dot.node("legend", label=legend_label, shape="none")
+    out.append("\tsubgraph cluster_legend {\n")
+    out.append("\t\trank=sink\n")
+    if positions:
+        # nop needs every node positioned: put the legend below the lowest row
+        legend_y = min(y for _, y in positions.values()) - 144
+        out.append(f'\t\tlegend [label={legend_label} shape=none pos="0,{legend_y}!"]\n')
+    else:
+        out.append(f"\t\tlegend [label={legend_label} shape=none]\n")
+    out.append("\t}\n")
+    # anchor legend to the leftmost node with an invisible, weighted edge so it sits left-bottom
+    leftmost = nodes_sorted[0] if nodes_sorted else None
+    if leftmost:
+        out.append(f'\tlegend -> "{quoted[leftmost]}" [constraint=true style=invis weight=100]\n')
+
+    # color mapping: classify each distinct interface type once rather than
+    # once per edge
+    style_map = {t: interface_style(t) for t in {e[3] for e in edges if e[3]}}
 
     # For each unique interface create an edge (Graphviz will attempt to draw
     # parallel curved edges when splines are enabled).
-    for idx, (src, dst, iface, inttype, dir_val) in enumerate(edges, start=1):
-        edge_attrs = {}
-        # color mapping
-        if inttype:
-            t = inttype.lower()
-            if "file" in t:
-                edge_attrs["color"] = "red"
-                edge_attrs["fontcolor"] = "red"
-            elif "webservice" in t or "web service" in t or "webservice" in t:
-                edge_attrs["color"] = "blue"
-                edge_attrs["fontcolor"] = "blue"
-
-        # direction handling: 1 = one-way, 2 = two-way
-        if dir_val == 2:
-            edge_attrs["dir"] = "both"
+    # direction handling: 1 = one-way, 2 = two-way
+    for src, dst, iface, inttype, dir_val in edges:
+        direction = "both" if dir_val == 2 else "forward"
+        color = style_map.get(inttype)
+        if color:
+            out.append(_COLORED_EDGE_TPL % (quoted[src], quoted[dst], _q(iface), direction, color, color))
         else:
-            edge_attrs["dir"] = "forward"
+            out.append(_EDGE_TPL % (quoted[src], quoted[dst], _q(iface), direction))
+    out.append("}\n")
+    # encoded once: the same bytes are written to disk and piped to `dot`
+    return "".join(out).encode("utf-8")
 
-        # ensure label/font size and place the interface name along the arrow
-        edge_attrs.setdefault("fontsize", "10")
-        # attempt to center the label on the edge (angle 0 and reasonable distance)
-        edge_attrs.setdefault("labelangle", "0")
-        edge_attrs.setdefault("labeldistance", "1.0")
-        # Use `label` only so the interface name appears on the arrow itself
-        # Graphviz python API will quote labels containing spaces
-        dot.edge(src, dst, label=iface, **edge_attrs)
 
+def output_base_name(focus):
     # choose output base name (include focus if provided)
-    base_name = f"architecture_{focus.replace(' ', '_')}" if focus else "architecture"
+    return f"architecture_{focus.replace(' ', '_')}" if focus else "architecture"
+
+
+async def run_dot(source, fmt, engine, limit):
+    # pipe DOT source (bytes) straight into the Graphviz executable and return
+    # the rendered output; raises if `dot` is missing or rejects the graph
+    async with limit:
+        proc = await asyncio.create_subprocess_exec(
+            "dot", f"-K{engine}", f"-T{fmt}",
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        out, err = await proc.communicate(source)
+    if proc.returncode != 0:
+        raise RuntimeError(err.decode("utf-8", "replace").strip())
+    return out
+
+
+async def render_diagram(base_name, source_bytes, engine, limit):
     dot_path = os.path.join(OUT_DIR, f"{base_name}.dot")
-    with open(dot_path, "w", encoding="utf-8") as f:
-        f.write(dot.source)
+    try:
+        with open(dot_path, "wb") as f:
+            f.write(source_bytes)
+    except OSError as e:
+        # e.g. a focus name containing a path separator; report it and leave
+        # the other diagrams of a batch alone
+        print("Could not write DOT file", dot_path, ":", e)
+        return False
 
     print("Wrote DOT file to:", dot_path)
 
     # try to render SVG and PNG
     svg_path = os.path.join(OUT_DIR, f"{base_name}.svg")
     png_path = os.path.join(OUT_DIR, f"{base_name}.png")
+    svg_job = asyncio.ensure_future(run_dot(source_bytes, "svg", engine, limit))
+    # without cairosvg the PNG needs its own dot run; start it alongside
+    # the SVG so the two layouts overlap
+    png_job = asyncio.ensure_future(run_dot(source_bytes, "png", engine, limit)) if cairosvg is None else None
+
+    svg_bytes = None
     try:
-        # render to svg
-        dot.render(filename=os.path.join(OUT_DIR, base_name), cleanup=True)
-        if os.path.exists(svg_path):
-            print("Rendered SVG to:", svg_path)
-        else:
-            print("Render finished but SVG not found at expected path.")
+        svg_bytes = await svg_job
+        with open(svg_path, "wb") as f:
+            f.write(svg_bytes)
+        print("Rendered SVG to:", svg_path)
     except Exception as e:
         print("Rendering failed (Graphviz executable may be missing):", e)
         print("You still have the DOT file and can render it with the 'dot' tool:")
-        print("  dot -Tsvg -o Output/Diagrams/architecture.svg Output/Diagrams/architecture.dot")
+        print(f"  dot -Tsvg -o {svg_path} {dot_path}")
 
-    # try to create a PNG using dot command if available
+    # try to create a PNG: rasterizing the SVG with cairosvg avoids a
+    # second Graphviz layout; it is CPU-bound, so run it in a worker thread
+    # to keep the other diagrams' renders moving
     try:
-        dot.format = "png"
-        dot.render(filename=os.path.join(OUT_DIR, base_name), cleanup=True)
-        if os.path.exists(png_path):
+        png_bytes = None
+        if png_job is not None:
+            png_bytes = await png_job
+        elif svg_bytes is not None:
+            try:
+                png_bytes = await asyncio.to_thread(cairosvg.svg2png, bytestring=svg_bytes)
+            except Exception as e:
+                print("cairosvg could not rasterize the SVG, falling back to dot -Tpng:", e)
+                png_bytes = await run_dot(source_bytes, "png", engine, limit)
+        if png_bytes:
+            with open(png_path, "wb") as f:
+                f.write(png_bytes)
             print("Rendered PNG to:", png_path)
     except Exception:
         # not fatal
         pass
+    return True
+
+
+async def render_all(diagrams, engine):
+    # render every (base_name, source) pair concurrently; the semaphore caps
+    # the number of simultaneous `dot` processes at the CPU count. Returns the
+    # number of diagrams that failed; one failure never cancels the others.
+    limit = asyncio.Semaphore(os.cpu_count() or 1)
+    results = await asyncio.gather(
+        *(render_diagram(name, src, engine, limit) for name, src in diagrams),
+        return_exceptions=True,
+    )
+    failed = 0
+    for (name, _), result in zip(diagrams, results):
+        if isinstance(result, Exception):
+            print(f"Diagram {name} failed:", result)
+        if result is not True:
+            failed += 1
+    return failed
+
+
+def read_focus_list(path):
+    # one focus node per line; blank lines and '#' comments are ignored.
+    # Entries are keyed by their output file name, compared case-insensitively:
+    # 'ISU'/'isu' or 'A B'/'A_B' would write the same .dot/.svg/.png paths, so
+    # only the first is kept. utf-8-sig drops a leading BOM from the first line.
+    foci = {}
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            name = line.strip()
+            if not name or name.startswith("#"):
+                continue
+            key = output_base_name(name).lower()
+            if key not in foci:
+                foci[key] = name
+            elif foci[key] != name:
+                print(f"Skipping focus {name!r}: its output files would overwrite those of {foci[key]!r}")
+    return list(foci.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate architecture diagram from Excel")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--focus", help="Only show edges where this node is source or destination (case-insensitive)")
+    target.add_argument(
+        "--batch",
+        metavar="FOCUS_LIST",
+        help="File with one focus node per line; renders one diagram per focus from a single read of the workbook",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["dot", "sfdp", "nop"],
+        default="dot",
+        help="Graphviz layout engine: 'sfdp' is much faster on large graphs; "
+        "'nop' skips layout and uses precomputed left-to-right rank positions",
+    )
+    args = parser.parse_args()
+    if args.batch:
+        foci = read_focus_list(args.batch)
+        if not foci:
+            print("No focus nodes listed in", args.batch)
+            sys.exit(0)
+    else:
+        foci = [args.focus.strip() if args.focus else None]
+    if not os.path.exists(EXCEL_PATH):
+        print(f"Excel file not found at {EXCEL_PATH}")
+        sys.exit(2)
+
+    edges = read_cached_edges(EXCEL_PATH)
+    if edges is None:
+        edges = read_inventory_edges(EXCEL_PATH)
+        write_cached_edges(EXCEL_PATH, edges)
+
+    # If a focus node was requested, filter edges to only those connected to focus
+    by_node = index_by_node(edges) if any(foci) else None
+    diagrams = []
+    for focus in foci:
+        selected = [edges[i] for i in by_node.get(focus.lower(), ())] if focus else edges
+        if selected:
+            diagrams.append((output_base_name(focus), build_dot_source(selected, args.engine)))
+        elif edges and focus:
+            print("No edges found for focus:", focus)
+
+    if not diagrams:
+        if not edges:
+            print("No valid edges found in the spreadsheet.")
+        elif args.batch:
+            print(f"None of the {len(foci)} focus nodes in {args.batch} matched any edge.")
+        sys.exit(0)
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    failed = asyncio.run(render_all(diagrams, args.engine))
+    if failed:
+        print(f"{failed} of {len(diagrams)} diagrams failed.")
+        sys.exit(1)
 
 
 if __name__ == "__main__":